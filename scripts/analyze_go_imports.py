@@ -11,104 +11,22 @@ Usage:
     python3 analyze_go_imports.py --json             # Output as JSON for scripting
 """
 
-import subprocess
 import json
 import sys
-from pathlib import Path
-from typing import Set, Dict, List
-
-# Go source directory
-SCRIPT_DIR = Path(__file__).parent
-GO_SRC_DIR = SCRIPT_DIR.parent / "src" / "go"
-
-# Module path prefix for internal packages
-MODULE_PREFIX = "github.com/fitglue/server/src/go/pkg"
-
-# List of Go functions
-GO_FUNCTIONS = [
-    "router",
-    "enricher",
-    "pipeline-splitter",
-    "strava-uploader",
-    "mock-uploader",
-    "parkrun-results-source",
-    "showcase-uploader",
-    "fit-parser-handler",
-    "hevy-uploader",
-    "trainingpeaks-uploader",
-    "intervals-uploader",
-    "googlesheets-uploader",
-]
-
-
-def get_pkg_dependencies(function_name: str) -> Set[str]:
-    """
-    Get all pkg/ subdirectories that a function depends on (directly or transitively).
-
-    Uses `go list -deps` to get the full dependency tree, then filters to just
-    internal pkg/ packages.
-
-    Returns:
-        Set of package paths relative to pkg/, e.g. {"bootstrap", "types/pb", "infrastructure/pubsub"}
-    """
-    function_path = f"./functions/{function_name}/..."
-
-    try:
-        result = subprocess.run(
-            ["go", "list", "-f", "{{.ImportPath}}", "-deps", function_path],
-            cwd=GO_SRC_DIR,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-    except subprocess.CalledProcessError as e:
-        print(f"Error analyzing {function_name}: {e.stderr}", file=sys.stderr)
-        return set()
-
-    pkg_deps = set()
-    for line in result.stdout.strip().split("\n"):
-        if line.startswith(MODULE_PREFIX):
-            # Extract the path relative to pkg/
-            relative_path = line[len(MODULE_PREFIX):].lstrip("/")
-            if relative_path:  # Skip the root pkg itself
-                pkg_deps.add(relative_path)
-
-    return pkg_deps
-
-
-def get_pkg_directories(pkg_deps: Set[str]) -> Set[str]:
-    """
-    Convert package import paths to directory paths that need to be copied.
-
-    For nested packages like "infrastructure/pubsub", we need to ensure the
-    parent directory structure exists, but we only need to copy the specific
-    subdirectory.
-
-    Returns:
-        Set of directory paths relative to pkg/ that need to be copied
-    """
-    directories = set()
-
-    for dep in pkg_deps:
-        # Add the package directory itself
-        directories.add(dep)
-
-        # For nested packages, we might also need parent files
-        # e.g., pkg/infrastructure/ might have common files
-        parts = dep.split("/")
-        for i in range(1, len(parts)):
-            parent = "/".join(parts[:i])
-            directories.add(parent)
-
-    return directories
+from concurrent.futures import ThreadPoolExecutor
+from typing import Set, Dict
+
+from go_deps import (
+    GO_FUNCTIONS,
+    GO_SRC_DIR,
+    get_all_pkg_dependencies,
+    get_pkg_dependencies,
+)
 
 
 def analyze_all_functions() -> Dict[str, Set[str]]:
     """Analyze all Go functions and return their pkg dependencies."""
-    results = {}
-    for fn in GO_FUNCTIONS:
-        results[fn] = get_pkg_dependencies(fn)
-    return results
+    return get_all_pkg_dependencies(GO_SRC_DIR)
 
 
 def print_analysis(results: Dict[str, Set[str]], json_output: bool = False):
@@ -154,17 +72,26 @@ def main():
 
     if args:
         # Analyze specific function(s)
-        results = {}
         for fn in args:
-            if fn in GO_FUNCTIONS:
-                results[fn] = get_pkg_dependencies(fn)
-            else:
+            if fn not in GO_FUNCTIONS:
                 print(f"Unknown function: {fn}", file=sys.stderr)
                 print(f"Available: {', '.join(GO_FUNCTIONS)}", file=sys.stderr)
                 sys.exit(1)
+
+        # Each query blocks on its own go list subprocess, so overlap them
+        try:
+            with ThreadPoolExecutor(max_workers=min(8, len(args))) as executor:
+                results = dict(zip(args, executor.map(get_pkg_dependencies, args)))
+        except RuntimeError as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(1)
     else:
         # Analyze all functions
-        results = analyze_all_functions()
+        try:
+            results = analyze_all_functions()
+        except RuntimeError as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(1)
 
     print_analysis(results, json_output)
 
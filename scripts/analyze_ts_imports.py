@@ -9,18 +9,53 @@ This module provides functions to:
 4. Resolve transitive dependencies between modules
 """
 
+import functools
+import hashlib
+import os
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Set, Dict, Any, Tuple
 
+# orjson parses config-sized JSON 2-5x faster than stdlib json; entirely
+# optional, so environments without it fall back transparently
+try:
+    import orjson as _json_fast
+except ImportError:
+    _json_fast = None
 
+
+# Single compiled pattern covering all three import forms, so each file is
+# scanned once instead of three times:
+#   from '@fitglue/shared/dist/...'            -> group 'deep'
+#   import [type] { ... } from '@fitglue/shared' -> group 'barrel'
+#   import * as x from '@fitglue/shared'       -> group 'ns'
+# Directory names never scanned for imports
+_EXCLUDED = frozenset({'node_modules', 'dist', 'build', 'coverage', '.git'})
+
+_IMPORT_RE = re.compile(
+    r"from\s+['\"](?P<deep>@fitglue/shared/[^'\"]+)['\"]"
+    r"|import\s+(?:type\s+)?{(?P<barrel>[^}]+)}\s+from\s+['\"]@fitglue/shared['\"]"
+    r"|import\s+\*\s+as\s+\w+\s+from\s+['\"](?P<ns>@fitglue/shared)['\"]",
+    re.MULTILINE,
+)
+
+
+@functools.lru_cache(maxsize=None)
 def load_modules_config(script_dir: Path | None = None) -> Dict[str, Any]:
-    """Load the shared modules configuration."""
+    """
+    Load the shared modules configuration.
+
+    Cached: analyze_handler calls this once per handler, and the config
+    never changes within a run, so parse the JSON only once.
+    """
     if script_dir is None:
         script_dir = Path(__file__).parent
     config_path = script_dir / 'shared_modules.json'
-    with open(config_path, 'r') as f:
+    with open(config_path, 'rb') as f:
+        if _json_fast is not None:
+            return _json_fast.loads(f.read())
         return json.load(f)
 
 
@@ -39,43 +74,68 @@ def extract_imports(file_path: Path) -> Tuple[Set[str], Set[str]]:
     - import type { ... } from '@fitglue/shared'
     """
     try:
-        content = file_path.read_text(encoding='utf-8')
+        raw = file_path.read_bytes()
     except Exception:
         return set(), set()
 
+    # Fast path: most files never mention the shared package at all, and a
+    # bytes substring test is far cheaper than running the regex engine.
+    # Checking before decoding also skips UTF-8 decoding for files that
+    # can't possibly match.
+    if b'@fitglue/shared' not in raw:
+        return set(), set()
+
+    content = raw.decode('utf-8', 'replace')
+
     imports = set()
     barrel_symbols = set()
 
-    # Pattern for deep imports (non-barrel)
-    # Match: from '@fitglue/shared/dist/...'
-    deep_pattern = r"from\s+['\"](@fitglue/shared/[^'\"]+)['\"]"
-    for match in re.finditer(deep_pattern, content):
-        imports.add(match.group(1))
-
-    # Pattern for barrel imports with named symbols
-    # Match: import { Symbol1, Symbol2 } from '@fitglue/shared'
-    # Match: import type { Symbol1 } from '@fitglue/shared'
-    barrel_pattern = r"import\s+(?:type\s+)?{([^}]+)}\s+from\s+['\"]@fitglue/shared['\"]"
-    for match in re.finditer(barrel_pattern, content):
-        symbols_str = match.group(1)
-        # Parse symbols, handling aliases (e.g., "Foo as Bar")
-        for symbol in symbols_str.split(','):
-            symbol = symbol.strip()
-            if ' as ' in symbol:
-                symbol = symbol.split(' as ')[0].strip()
-            if symbol:
-                barrel_symbols.add(symbol)
-
-    # Pattern for namespace imports
-    # Match: import * as shared from '@fitglue/shared'
-    namespace_pattern = r"import\s+\*\s+as\s+\w+\s+from\s+['\"]@fitglue/shared['\"]"
-    if re.search(namespace_pattern, content):
-        # Namespace import = needs everything from barrel
-        imports.add('@fitglue/shared')
+    for match in _IMPORT_RE.finditer(content):
+        deep = match.group('deep')
+        if deep is not None:
+            imports.add(deep)
+            continue
+
+        symbols_str = match.group('barrel')
+        if symbols_str is not None:
+            # Parse symbols, handling aliases (e.g., "Foo as Bar")
+            for symbol in symbols_str.split(','):
+                symbol = symbol.strip()
+                if ' as ' in symbol:
+                    symbol = symbol.split(' as ')[0].strip()
+                if symbol:
+                    barrel_symbols.add(symbol)
+            continue
+
+        if match.group('ns') is not None:
+            # Namespace import = needs everything from barrel
+            imports.add('@fitglue/shared')
 
     return imports, barrel_symbols
 
 
+def _walk_ts(root: Path):
+    """
+    Yield every .ts file under root, pruning excluded directories.
+
+    Unlike rglob, excluded trees (node_modules in particular) are never
+    descended into, so no Path objects are built just to be filtered out.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _EXCLUDED:
+                            stack.append(entry.path)
+                    elif entry.name.endswith('.ts'):
+                        yield Path(entry.path)
+        except OSError:
+            continue
+
+
 def get_handler_imports(handler_dir: Path) -> Tuple[Set[str], Set[str]]:
     """
     Get all @fitglue/shared imports for a handler.
@@ -89,19 +149,49 @@ def get_handler_imports(handler_dir: Path) -> Tuple[Set[str], Set[str]]:
     all_imports = set()
     all_symbols = set()
 
-    for ts_file in handler_dir.rglob("*.ts"):
-        # Skip excluded directories
-        path_str = str(ts_file)
-        if any(excl in path_str for excl in ['node_modules', 'dist', 'build', 'coverage']):
-            continue
+    ts_files = list(_walk_ts(handler_dir))
 
-        imports, symbols = extract_imports(ts_file)
-        all_imports.update(imports)
-        all_symbols.update(symbols)
+    # The scan is dominated by file opens/reads, so overlap the I/O
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for imports, symbols in executor.map(extract_imports, ts_files):
+            all_imports.update(imports)
+            all_symbols.update(symbols)
 
     return all_imports, all_symbols
 
 
+@functools.lru_cache(maxsize=None)
+def _build_pattern_trie(patterns: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Build a character trie over import_patterns keys.
+
+    Terminal nodes carry the full pattern under the '' key, so the longest
+    matching prefix for an import can be found in one O(len(import)) walk
+    instead of scanning every pattern per import.
+    """
+    trie: Dict[str, Any] = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[''] = pattern
+    return trie
+
+
+def _longest_pattern_match(imp: str, trie: Dict[str, Any]) -> str | None:
+    """Find the longest import_patterns key that is a prefix of imp."""
+    node = trie
+    best_match = node.get('')
+    for char in imp:
+        node = node.get(char)
+        if node is None:
+            break
+        terminal = node.get('')
+        if terminal is not None:
+            best_match = terminal
+    return best_match
+
+
 def resolve_modules(
     deep_imports: Set[str],
     barrel_symbols: Set[str],
@@ -120,6 +210,10 @@ def resolve_modules(
     import_patterns = modules_config.get("import_patterns", {})
     modules = modules_config.get("modules", {})
 
+    # Trie over pattern keys: longest-prefix lookup per import is O(len)
+    # instead of a scan over every pattern (cached across calls)
+    pattern_trie = _build_pattern_trie(tuple(import_patterns))
+
     # Handle deep imports (specific paths like @fitglue/shared/dist/types/pb/user)
     for imp in deep_imports:
         # Skip barrel imports - handled separately
@@ -127,13 +221,7 @@ def resolve_modules(
             continue
 
         # Find matching pattern (longest match wins for specificity)
-        best_match = None
-        best_len = 0
-
-        for pattern in import_patterns:
-            if imp.startswith(pattern) and len(pattern) > best_len:
-                best_match = pattern
-                best_len = len(pattern)
+        best_match = _longest_pattern_match(imp, pattern_trie)
 
         if best_match:
             # Add all modules associated with this pattern
@@ -160,24 +248,19 @@ def resolve_modules(
         if mod_config.get("always_include", False):
             required.add(mod_id)
 
-    # Resolve transitive dependencies (iterate until no changes)
-    changed = True
-    iterations = 0
-    max_iterations = 50  # Safety limit
-
-    while changed and iterations < max_iterations:
-        changed = False
-        iterations += 1
-
-        for mod_id in list(required):
-            if mod_id not in modules:
-                continue
+    # Resolve transitive dependencies with a single depth-first walk over
+    # depends_on edges — each module is visited exactly once, instead of
+    # re-scanning the whole required set until a fixed point is reached
+    stack = list(required)
+    while stack:
+        mod_id = stack.pop()
+        if mod_id not in modules:
+            continue
 
-            deps = modules[mod_id].get("depends_on", [])
-            for dep in deps:
-                if dep not in required:
-                    required.add(dep)
-                    changed = True
+        for dep in modules[mod_id].get("depends_on", ()):
+            if dep not in required:
+                required.add(dep)
+                stack.append(dep)
 
     return required
 
@@ -201,10 +284,56 @@ def get_module_paths(required_modules: Set[str], modules_config: Dict[str, Any])
     return paths
 
 
+# On-disk cache of analyze_handler results, keyed on handler source stats,
+# so repeated runs (CI, build scripts) skip the scan for unchanged handlers
+_CACHE_DIR = Path('/tmp/.fitglue-import-cache')
+
+
+def _cache_key(handler_name: str, handler_dir: Path) -> str:
+    """Digest of the handler's .ts file stats plus the modules config stat."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(handler_name.encode())
+
+    config_path = Path(__file__).parent / 'shared_modules.json'
+    try:
+        config_stat = config_path.stat()
+        digest.update(f"|config|{config_stat.st_mtime_ns}|{config_stat.st_size}".encode())
+    except OSError:
+        pass
+
+    for ts_file in sorted(_walk_ts(handler_dir)):
+        stat = ts_file.stat()
+        rel = ts_file.relative_to(handler_dir)
+        digest.update(f"|{rel}|{stat.st_mtime_ns}|{stat.st_size}".encode())
+
+    return digest.hexdigest()
+
+
+def _load_cached_analysis(key: str) -> Dict[str, Any] | None:
+    try:
+        with open(_CACHE_DIR / f"{key}.json", 'r') as f:
+            cached = json.load(f)
+        return {field: set(values) for field, values in cached.items()}
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_analysis(key: str, result: Dict[str, Any]) -> None:
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_CACHE_DIR / f"{key}.json", 'w') as f:
+            json.dump({field: sorted(values) for field, values in result.items()}, f)
+    except OSError:
+        pass  # Cache is best-effort only
+
+
 def analyze_handler(handler_name: str, ts_src_dir: Path) -> Dict[str, Any]:
     """
     Analyze a single handler and return its module requirements.
 
+    Results are cached on disk keyed by source file stats, so unchanged
+    handlers skip the scan entirely on repeat runs.
+
     Returns dict with:
     - deep_imports: set of deep import paths
     - barrel_symbols: set of symbols imported from barrel
@@ -212,18 +341,26 @@ def analyze_handler(handler_name: str, ts_src_dir: Path) -> Dict[str, Any]:
     - paths: set of paths to include from shared/
     """
     handler_dir = ts_src_dir / handler_name
+
+    key = _cache_key(handler_name, handler_dir)
+    cached = _load_cached_analysis(key)
+    if cached is not None:
+        return cached
+
     modules_config = load_modules_config()
 
     deep_imports, barrel_symbols = get_handler_imports(handler_dir)
     required_modules = resolve_modules(deep_imports, barrel_symbols, modules_config)
     required_paths = get_module_paths(required_modules, modules_config)
 
-    return {
+    result = {
         'deep_imports': deep_imports,
         'barrel_symbols': barrel_symbols,
         'modules': required_modules,
         'paths': required_paths
     }
+    _save_cached_analysis(key, result)
+    return result
 
 
 def main():
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Build deployment zips for the Go Cloud Functions.
+
+Each function is packaged with its own sources, a pruned copy of pkg/
+(only the packages it actually imports, per analyze_go_imports), and the
+module's go.mod/go.sum. Zips are deterministic: fixed timestamps and
+permissions so unchanged inputs produce bit-identical archives.
+
+Usage:
+    python3 build_function_zips.py                   # Build all functions
+    python3 build_function_zips.py router            # Build specific function(s)
+    python3 build_function_zips.py --no-prune        # Include all of pkg/
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Optional, Set
+
+from go_deps import (
+    GO_FUNCTIONS,
+    GO_SRC_DIR,
+    get_all_pkg_dependencies,
+    get_pkg_dependencies,
+)
+from zip_utils import OUTPUT_DIR, is_unchanged, manifest_digest, write_zip
+
+
+def iter_pkg_entries(src_pkg: Path, needed_packages: Optional[Set[str]]):
+    """
+    Yield (src_path, arcname) pairs for the pkg/ portion of an archive.
+
+    Walks each needed package with os.scandir (cached entry types, no
+    per-file stat) instead of rglob, skipping *_test.go files.
+
+    needed_packages of None means "include all of pkg/" (--no-prune).
+    """
+    if needed_packages is None:
+        pkg_roots = [src_pkg]
+    else:
+        pkg_roots = [src_pkg / p for p in sorted(needed_packages)]
+
+    src_pkg_str = os.fspath(src_pkg)
+    seen = set()
+    for root in pkg_roots:
+        stack = [os.fspath(root)]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = sorted(os.scandir(current), key=lambda e: e.name)
+            except (NotADirectoryError, FileNotFoundError):
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif not entry.name.endswith("_test.go"):
+                    rel = os.path.relpath(entry.path, src_pkg_str)
+                    arcname = f"pkg/{rel}"
+                    # Nested packages can appear under more than one root
+                    if arcname not in seen:
+                        seen.add(arcname)
+                        yield Path(entry.path), arcname
+
+
+def iter_archive_entries(function_dir: Path, src_dir: Path, needed_packages: Optional[Set[str]]):
+    """
+    Yield (src_path, arcname) pairs for everything that goes into a
+    function's zip, in deterministic order.
+
+    Replaces the old temp-dir staging: entries are fed straight into the
+    archive writer, so no file is copied to disk just to be re-read.
+
+    needed_packages of None means "include all of pkg/" (--no-prune).
+    """
+    # Function sources at the archive root
+    for item in sorted(function_dir.iterdir()):
+        if item.is_file() and not item.name.endswith("_test.go"):
+            yield item, item.name
+        elif item.is_dir() and item.name != "cmd":
+            for path in sorted(item.rglob("*")):
+                if path.is_file() and not path.name.endswith("_test.go"):
+                    yield path, str(path.relative_to(function_dir))
+
+    # Pruned (or full) pkg/ tree
+    yield from iter_pkg_entries(src_dir / "pkg", needed_packages)
+
+    # Module definition
+    yield src_dir / "go.mod", "go.mod"
+    yield src_dir / "go.sum", "go.sum"
+
+
+def create_function_zip(
+    function_name: str,
+    src_dir: Path,
+    output_dir: Path,
+    needed_packages: Optional[Set[str]] = None,
+    prune: bool = True,
+) -> Path:
+    """
+    Build a deterministic deployment zip for one function.
+
+    Sources are streamed straight from the repo into the archive with
+    fixed dates and permissions; nothing is staged on disk first. If the
+    input manifest matches the digest sidecar of an existing zip, the
+    rebuild is skipped entirely.
+    """
+    function_dir = src_dir / "functions" / function_name
+
+    if prune:
+        if needed_packages is None:
+            needed_packages = get_pkg_dependencies(function_name)
+    else:
+        needed_packages = None
+
+    zip_path = output_dir / f"{function_name}.zip"
+    digest_path = output_dir / f"{function_name}.sha256"
+
+    entries = list(iter_archive_entries(function_dir, src_dir, needed_packages))
+    digest = manifest_digest(entries)
+    if is_unchanged(zip_path, digest_path, digest):
+        print(f"  {function_name}: unchanged, skipping")
+        return zip_path
+
+    write_zip(zip_path, entries)
+    digest_path.write_text(digest + "\n")
+
+    size_kb = zip_path.stat().st_size // 1024
+    print(f"  {function_name}: {size_kb} KB -> {zip_path}")
+    return zip_path
+
+
+def main():
+    args = sys.argv[1:]
+
+    prune = "--no-prune" not in args
+    args = [a for a in args if a != "--no-prune"]
+
+    functions = args if args else GO_FUNCTIONS
+    for fn in functions:
+        if fn not in GO_FUNCTIONS:
+            print(f"Unknown function: {fn}", file=sys.stderr)
+            print(f"Available: {', '.join(GO_FUNCTIONS)}", file=sys.stderr)
+            sys.exit(1)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Analyze every function with a single `go list -deps` invocation
+    # instead of shelling out to go once per function. Analysis failure is
+    # fatal: building on an empty dependency map would produce zips with
+    # no pkg/ tree at all.
+    try:
+        all_deps = get_all_pkg_dependencies(GO_SRC_DIR) if prune else {}
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Building {len(functions)} function zips (prune={prune})...")
+
+    # Each zip is an independent tree-copy + deflate job, so build them in
+    # parallel. The dep graph is computed once in the parent and handed to
+    # the workers, so workers never shell out to go themselves.
+    build_one = partial(create_function_zip, src_dir=GO_SRC_DIR, output_dir=OUTPUT_DIR, prune=prune)
+    with ProcessPoolExecutor(max_workers=min(len(functions), os.cpu_count() or 1)) as executor:
+        futures = [
+            executor.submit(build_one, fn, needed_packages=all_deps.get(fn))
+            for fn in functions
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except RuntimeError as exc:
+                print(exc, file=sys.stderr)
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Build deployment zips for the TypeScript Cloud Function handlers.
+
+Each handler is packaged with its own sources, the shared/ modules it
+actually imports (per analyze_ts_imports), a generated package.json based
+on the root one, and the root package-lock.json. Zips are deterministic:
+fixed timestamps and permissions so unchanged inputs produce bit-identical
+archives.
+
+Usage:
+    python3 build_typescript_zips.py                 # Build all handlers
+    python3 build_typescript_zips.py uploader        # Build specific handler(s)
+    python3 build_typescript_zips.py --no-prune      # Include all of shared/
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from zip_utils import OUTPUT_DIR, is_unchanged, manifest_digest, write_zip
+
+# TypeScript source directory
+SCRIPT_DIR = Path(__file__).parent
+TS_SRC_DIR = SCRIPT_DIR.parent / "src" / "typescript"
+
+# Directories under src/typescript that are not deployable handlers
+NON_HANDLER_DIRS = {"shared", "admin-cli", "mcp-server", "node_modules", "parkrun-fetcher"}
+
+# Names never copied into a handler zip
+EXCLUDE_PATTERNS = frozenset({"node_modules", "dist", "build", "coverage", ".git", "__tests__"})
+
+# Archive-root names that create_handler_zip writes from memory; the
+# handler's own copies must not ship alongside them
+GENERATED_ARCNAMES = frozenset({"package.json", "index.js", "package-lock.json"})
+
+def get_handler_dirs(ts_src_dir: Path) -> List[str]:
+    """
+    Auto-discover handler directories (same logic as analyze_ts_imports).
+
+    Uses os.scandir so the directory check comes from the entry type cached
+    by the directory read; only actual candidates pay a package.json stat.
+    """
+    handlers = []
+    with os.scandir(ts_src_dir) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False) and entry.name not in NON_HANDLER_DIRS:
+                if os.path.exists(os.path.join(entry.path, "package.json")):
+                    handlers.append(entry.name)
+    return handlers
+
+
+def _iter_filtered(src: Path, arc_prefix: str):
+    """
+    Yield (src_path, arcname) for every file under src, skipping excluded
+    names and test files, in deterministic sorted order.
+
+    One scandir descent does it all: entry types come from the directory
+    read (no per-entry stat) and arcnames are built on the way down, so no
+    separate collect/relpath pass is needed.
+    """
+    with os.scandir(src) as entries:
+        ordered = sorted(entries, key=lambda e: e.name)
+    for entry in ordered:
+        if entry.name in EXCLUDE_PATTERNS:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_filtered(Path(entry.path), f"{arc_prefix}{entry.name}/")
+        elif entry.is_file(follow_symlinks=False) and not entry.name.endswith((".test.ts", ".spec.ts")):
+            yield Path(entry.path), f"{arc_prefix}{entry.name}"
+
+
+def iter_handler_entries(handler_dir: Path, ts_src_dir: Path, required_paths: Optional[set]):
+    """
+    Yield (src_path, arcname) pairs for everything in a handler's zip that
+    comes straight from the repo tree.
+
+    Replaces the old temp-dir staging: entries are fed directly into the
+    archive writer, so no file is linked or copied to disk just to be
+    re-read. Generated files (package.json, index.js) are written by the
+    caller since they have no source path.
+
+    required_paths of None means "include all of shared/" (--no-prune).
+    """
+    # Handler sources at the archive root. Root files that the caller
+    # regenerates are skipped: every handler has its own package.json
+    # (that's how get_handler_dirs finds it), and shipping both copies
+    # would leave duplicate entries in the zip with the winner up to the
+    # consumer's extractor.
+    for src_path, arcname in _iter_filtered(handler_dir, ""):
+        if arcname not in GENERATED_ARCNAMES:
+            yield src_path, arcname
+
+    # Shared package, pruned to the analyzer-selected paths when given
+    shared_src = ts_src_dir / "shared"
+    if required_paths is None:
+        yield from _iter_filtered(shared_src, "shared/")
+    else:
+        seen = set()
+        for rel_path in sorted(required_paths):
+            src = shared_src / rel_path
+            if src.is_dir():
+                entries = _iter_filtered(src, f"shared/{rel_path}/")
+            elif src.is_file():
+                entries = [(src, f"shared/{rel_path}")]
+            else:
+                continue
+            for src_path, arcname in entries:
+                # Overlapping module paths can repeat files
+                if arcname not in seen:
+                    seen.add(arcname)
+                    yield src_path, arcname
+
+        # The shared package manifest always ships
+        manifest = shared_src / "package.json"
+        if manifest.is_file() and "shared/package.json" not in seen:
+            yield manifest, "shared/package.json"
+
+
+def create_handler_zip(
+    handler_name: str,
+    ts_src_dir: Path,
+    output_dir: Path,
+    root_pkg: Dict[str, Any],
+    lock_bytes: Optional[bytes] = None,
+    modules_config: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """
+    Build a deterministic deployment zip for one handler.
+
+    Handler sources and the (pruned) shared/ tree are streamed straight
+    from the repo into the archive with fixed dates and permissions; the
+    generated package.json and index.js, and the lockfile bytes parsed
+    once by main(), are written from memory. Nothing is staged on disk.
+    """
+    handler_dir = ts_src_dir / handler_name
+
+    # Shared modules, pruned to what the handler imports when configured.
+    # analyze_handler caches its result on disk keyed by source file stats,
+    # so unchanged handlers skip the scan/resolve work across invocations.
+    required_paths = None
+    if modules_config is not None:
+        # Lazy import: --no-prune runs (and workers for them) never pay for
+        # the analyzer module at all
+        from analyze_ts_imports import analyze_handler
+        required_paths = analyze_handler(handler_name, ts_src_dir)['paths']
+
+    # Generated package.json: root dependencies + the local shared package
+    zip_pkg = {
+        "name": handler_name,
+        "version": root_pkg.get("version", "0.0.0"),
+        "main": "index.js",
+        "engines": root_pkg.get("engines", {}),
+        "dependencies": {
+            **root_pkg.get("dependencies", {}),
+            "@fitglue/shared": "file:./shared",
+        },
+    }
+    generated = [
+        # No indentation: only npm reads this file, and skipping the
+        # pretty-printer makes the dump a single tight pass
+        ("package.json", json.dumps(zip_pkg, separators=(",", ": ")) + "\n"),
+        # Entrypoint shim for the Functions Framework
+        ("index.js", "module.exports = require('./dist/index');\n"),
+    ]
+    if lock_bytes is not None:
+        # Lockfile for reproducible installs, read once in main()
+        generated.append(("package-lock.json", lock_bytes))
+
+    all_entries = list(iter_handler_entries(handler_dir, ts_src_dir, required_paths))
+
+    zip_path = output_dir / f"{handler_name}.zip"
+    digest_path = output_dir / f"{handler_name}.sha256"
+
+    digest = manifest_digest(all_entries, generated)
+    if is_unchanged(zip_path, digest_path, digest):
+        print(f"  {handler_name}: unchanged, skipping")
+        return zip_path
+
+    write_zip(zip_path, all_entries, generated)
+    digest_path.write_text(digest + "\n")
+
+    size_kb = zip_path.stat().st_size // 1024
+    print(f"  {handler_name}: {size_kb} KB -> {zip_path}")
+    return zip_path
+
+
+def main():
+    args = sys.argv[1:]
+
+    prune = "--no-prune" not in args
+    args = [a for a in args if a != "--no-prune"]
+
+    handlers = get_handler_dirs(TS_SRC_DIR)
+    if args:
+        for handler in args:
+            if handler not in handlers:
+                print(f"Unknown handler: {handler}", file=sys.stderr)
+                print(f"Available: {', '.join(handlers)}", file=sys.stderr)
+                sys.exit(1)
+        handlers = args
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    if prune:
+        from analyze_ts_imports import load_modules_config
+        modules_config = load_modules_config()
+    else:
+        modules_config = None
+
+    # The root package.json and lockfile are identical for every handler:
+    # parse/read them once here instead of once per worker
+    with open(TS_SRC_DIR / "package.json") as f:
+        root_pkg = json.load(f)
+    lock_file = TS_SRC_DIR / "package-lock.json"
+    lock_bytes = lock_file.read_bytes() if lock_file.is_file() else None
+
+    print(f"Building {len(handlers)} handler zips (prune={prune})...")
+
+    # Workers spend much of their time in Python-level walks and JSON work
+    # that hold the GIL, so separate interpreters beat threads here; all
+    # arguments (Path, dict, bytes) pickle cleanly
+    with ProcessPoolExecutor(max_workers=min(len(handlers), os.cpu_count() or 1)) as executor:
+        futures = [
+            executor.submit(
+                create_handler_zip, handler, TS_SRC_DIR, OUTPUT_DIR,
+                root_pkg, lock_bytes, modules_config,
+            )
+            for handler in handlers
+        ]
+        for future in futures:
+            future.result()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Shared `go list` dependency analysis for the Go function tooling.
+
+Both analyze_go_imports.py and build_function_zips.py need the per-function
+pkg/ dependency closure. This module holds the single batched + disk-cached
+implementation so a dev loop that runs analyze and then build pays for
+`go list` at most once.
+"""
+
+import hashlib
+import subprocess
+import json
+import threading
+from pathlib import Path
+from typing import Set, Dict, List
+
+# Go source directory
+SCRIPT_DIR = Path(__file__).parent
+GO_SRC_DIR = SCRIPT_DIR.parent / "src" / "go"
+
+# Module path prefix for internal packages
+MODULE_PREFIX = "github.com/fitglue/server/src/go/pkg"
+
+# Module path prefix for function packages
+FUNCTIONS_PREFIX = "github.com/fitglue/server/src/go/functions"
+
+# List of Go functions
+GO_FUNCTIONS = [
+    "router",
+    "enricher",
+    "pipeline-splitter",
+    "strava-uploader",
+    "mock-uploader",
+    "parkrun-results-source",
+    "showcase-uploader",
+    "fit-parser-handler",
+    "hevy-uploader",
+    "trainingpeaks-uploader",
+    "intervals-uploader",
+    "googlesheets-uploader",
+]
+
+# On-disk cache of go list results so repeated runs (CI, the build script)
+# skip the subprocess entirely when the module and function sources are
+# unchanged
+_DEP_CACHE_DIR = Path("/tmp/.fitglue-go-dep-cache")
+
+
+def _drain_stderr(proc: subprocess.Popen):
+    """
+    Read a subprocess's stderr on a side thread.
+
+    The stdout loops below read to EOF before looking at stderr; if go
+    fills the stderr pipe buffer first, it stops producing stdout and both
+    sides deadlock. Draining concurrently keeps go unblocked.
+    """
+    chunks: List[str] = []
+    thread = threading.Thread(target=lambda: chunks.append(proc.stderr.read()))
+    thread.start()
+    return thread, chunks
+
+
+def _dep_cache_path(function_name: str, src_dir: Path) -> Path:
+    """Cache file keyed on go.mod/go.sum contents and function source stats."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(function_name.encode())
+
+    for name in ("go.mod", "go.sum"):
+        try:
+            digest.update((src_dir / name).read_bytes())
+        except OSError:
+            pass
+
+    function_dir = src_dir / "functions" / function_name
+    for path in sorted(function_dir.rglob("*.go")):
+        stat = path.stat()
+        rel = path.relative_to(function_dir)
+        digest.update(f"|{rel}|{stat.st_mtime_ns}|{stat.st_size}".encode())
+
+    # The closure also depends on the import statements inside pkg/
+    # itself, so edits there must invalidate every function's cache
+    pkg_dir = src_dir / "pkg"
+    for path in sorted(pkg_dir.rglob("*.go")):
+        stat = path.stat()
+        rel = path.relative_to(pkg_dir)
+        digest.update(f"|pkg/{rel}|{stat.st_mtime_ns}|{stat.st_size}".encode())
+
+    return _DEP_CACHE_DIR / f"{digest.hexdigest()}.json"
+
+
+def get_pkg_dependencies(function_name: str) -> Set[str]:
+    """
+    Get all pkg/ subdirectories that a function depends on (directly or transitively).
+
+    Uses `go list -deps` to get the full dependency tree, then filters to just
+    internal pkg/ packages. Results are cached on disk keyed by go.mod/go.sum
+    and the function's sources, so no-change reruns never shell out to go.
+
+    Returns:
+        Set of package paths relative to pkg/, e.g. {"bootstrap", "types/pb", "infrastructure/pubsub"}
+    """
+    cache_path = _dep_cache_path(function_name, GO_SRC_DIR)
+    try:
+        with open(cache_path, 'r') as f:
+            return set(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+    function_path = f"./functions/{function_name}/..."
+
+    # Stream go list's stdout line by line instead of buffering all of it;
+    # parsing overlaps with go's own output and peak memory stays flat.
+    proc = subprocess.Popen(
+        ["go", "list", "-f", "{{.ImportPath}}", "-deps", function_path],
+        cwd=GO_SRC_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    stderr_thread, stderr_chunks = _drain_stderr(proc)
+
+    pkg_deps = set()
+    for line in proc.stdout:
+        line = line.rstrip()
+        if line.startswith(MODULE_PREFIX):
+            # Extract the path relative to pkg/
+            relative_path = line[len(MODULE_PREFIX):].lstrip("/")
+            if relative_path:  # Skip the root pkg itself
+                pkg_deps.add(relative_path)
+
+    stderr_thread.join()
+    if proc.wait() != 0:
+        # A partial result here would let the build ship zips with pkg/
+        # packages missing, so failure must be loud
+        raise RuntimeError(f"go list failed for {function_name}: {''.join(stderr_chunks)}")
+
+    try:
+        _DEP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump(sorted(pkg_deps), f)
+    except OSError:
+        pass  # Cache is best-effort only
+
+    return pkg_deps
+
+
+def get_all_pkg_dependencies(src_dir: Path = GO_SRC_DIR) -> Dict[str, Set[str]]:
+    """
+    Get pkg/ dependencies for every function from a single `go list -deps` run.
+
+    Each `go list -deps` invocation re-parses and re-analyzes the whole shared
+    pkg/ tree, so calling it once per function pays that cost 12 times over.
+    Instead, list every function package (and its deps) in one invocation,
+    then compute each function's transitive closure locally from the
+    returned import graph.
+
+    Returns:
+        Mapping of function name to its set of pkg/ paths, in the same
+        format as get_pkg_dependencies.
+    """
+    # Stream go list's stdout line by line instead of buffering all of it;
+    # the graph can run to megabytes for the full functions tree.
+    proc = subprocess.Popen(
+        [
+            "go", "list", "-deps",
+            "-f", "{{.ImportPath}} {{range .Deps}}{{.}} {{end}}",
+            "./functions/...",
+        ],
+        cwd=src_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    stderr_thread, stderr_chunks = _drain_stderr(proc)
+
+    # Build the full import graph: import path -> list of direct deps
+    pkg_to_deps: Dict[str, List[str]] = {}
+    for line in proc.stdout:
+        parts = line.split()
+        if parts:
+            pkg_to_deps[parts[0]] = parts[1:]
+
+    stderr_thread.join()
+    if proc.wait() != 0:
+        # Degrading to empty dependency sets would silently prune pkg/ out
+        # of every zip built from this result
+        raise RuntimeError(f"go list failed for ./functions/...: {''.join(stderr_chunks)}")
+
+    # Walk the graph once per function, filtering to internal pkg/ packages
+    results: Dict[str, Set[str]] = {}
+    for fn in GO_FUNCTIONS:
+        root_prefix = f"{FUNCTIONS_PREFIX}/{fn}"
+        stack = [
+            ip for ip in pkg_to_deps
+            if ip == root_prefix or ip.startswith(root_prefix + "/")
+        ]
+        seen = set(stack)
+        pkg_deps: Set[str] = set()
+
+        while stack:
+            ip = stack.pop()
+            if ip.startswith(MODULE_PREFIX):
+                relative_path = ip[len(MODULE_PREFIX):].lstrip("/")
+                if relative_path:  # Skip the root pkg itself
+                    pkg_deps.add(relative_path)
+            for dep in pkg_to_deps.get(ip, ()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+
+        results[fn] = pkg_deps
+
+    return results
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Validate shared_modules.json against the shared/ package on disk.
+
+Checks that:
+1. Every path referenced by a module exists
+2. Every depends_on target is a defined module
+3. Every import_patterns value points at defined modules
+4. package.json barrel exports map to sources covered by a module
+5. Every directory under shared/src is covered by some module
+
+Used by `make lint-shared-modules` to keep the pruning config honest.
+
+Usage:
+    python3 validate_shared_modules.py               # Incremental: skips when inputs unchanged
+    python3 validate_shared_modules.py --force       # Revalidate regardless of the cache
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sys
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from analyze_ts_imports import load_modules_config
+
+# Same optional accelerator as analyze_ts_imports: orjson parses the JSON
+# configs several times faster, stdlib json otherwise
+try:
+    import orjson as _json_fast
+except ImportError:
+    _json_fast = None
+
+SCRIPT_DIR = Path(__file__).parent
+SHARED_DIR = SCRIPT_DIR.parent / "src" / "typescript" / "shared"
+
+# Records the input digest of the last green run so unchanged reruns can
+# exit immediately; --force bypasses it
+_CACHE_FILE = Path.home() / ".cache" / "fitglue" / "validate_shared_modules.bin"
+
+# Names that are never part of the shipped module tree, split into exact
+# names and suffixes so each kind gets a single C-level check
+_IGNORE_LITERALS = frozenset({'__pycache__', 'node_modules', 'dist', 'build', '.DS_Store'})
+_IGNORE_SUFFIXES = ('.test.ts', '.spec.ts')
+
+
+def should_ignore(name: str) -> bool:
+    """True for names that are never part of the shipped module tree."""
+    return name[:1] == '.' or name in _IGNORE_LITERALS or name.endswith(_IGNORE_SUFFIXES)
+
+
+@dataclass
+class FSState:
+    """Snapshot of the shared/src tree from a single traversal."""
+    top_level: Set[str]
+    all_paths: Set[str]
+    integrations_children: Set[str]
+
+
+def collect_fs_state(shared_src_dir: Path) -> FSState:
+    """
+    Walk shared/src once and collect everything the validators need:
+    top-level directory names, every src/-relative path, and the
+    integration subdirectories.
+
+    One traversal replaces the separate walks the validators used to do
+    themselves, so the tree is read from disk exactly once per run.
+    os.walk keeps the descent loop in the stdlib's scandir-based C-backed
+    implementation, and pruning dirnames in place skips ignored subtrees
+    (and everything below integration roots, which no validator inspects)
+    without ever reading them.
+    """
+    top_level: Set[str] = set()
+    all_paths: Set[str] = set()
+    integrations_children: Set[str] = set()
+
+    base = os.fspath(shared_src_dir)
+    for root, dirs, files in os.walk(base, topdown=True):
+        rel = os.path.relpath(root, base)
+        dirs[:] = sorted(d for d in dirs if not should_ignore(d))
+
+        if rel == '.':
+            rel = ''
+            top_level.update(sys.intern(d) for d in dirs)
+        elif rel == 'integrations':
+            integrations_children.update(sys.intern(d) for d in dirs)
+        elif rel.startswith('integrations' + os.sep):
+            # Coverage is only checked one level under integrations/
+            dirs[:] = []
+
+        # Interned names make later set lookups a pointer compare
+        prefix = f"src/{rel}/" if rel else "src/"
+        for d in dirs:
+            all_paths.add(sys.intern(prefix + d))
+        for fname in files:
+            if not should_ignore(fname):
+                all_paths.add(sys.intern(prefix + fname))
+
+    return FSState(top_level, all_paths, integrations_children)
+
+
+def get_defined_paths(modules_config: Dict[str, Any]) -> Set[str]:
+    """All paths referenced by any module in the config."""
+    # Interned to match the interned names from collect_fs_state; the
+    # empty-tuple default avoids allocating a list per miss
+    return {
+        sys.intern(path)
+        for module in modules_config.get('modules', {}).values()
+        for path in module.get('paths', ())
+    }
+
+
+def _batch_exists(paths: List[str]) -> List[bool]:
+    """
+    os.path.exists for every path, in order, overlapped across threads.
+
+    stat releases the GIL, so on network or virtualized filesystems the
+    per-call latency overlaps instead of summing.
+    """
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+        return list(executor.map(os.path.exists, paths))
+
+
+def validate_paths_exist(modules_config: Dict[str, Any], shared_dir: Path) -> Iterator[str]:
+    """Every path a module references must exist under shared/."""
+    # Modules can legitimately share paths; group them so each unique path
+    # is stat'ed exactly once
+    path_to_modules: Dict[str, List[str]] = {}
+    for mod_id, module in modules_config.get('modules', {}).items():
+        for path in module.get('paths', []):
+            path_to_modules.setdefault(path, []).append(mod_id)
+
+    # Plain string joins: no Path object construction in the hot loop
+    base = os.fspath(shared_dir)
+    paths = list(path_to_modules)
+    exists = _batch_exists([os.path.join(base, p) for p in paths])
+    missing = {p for p, found in zip(paths, exists) if not found}
+
+    for path in sorted(missing):
+        for mod_id in path_to_modules[path]:
+            yield f"Module '{mod_id}' references non-existent path: {path}"
+
+
+def validate_dependencies_exist(modules_config: Dict[str, Any], module_names: frozenset) -> Iterator[str]:
+    """Every depends_on target must be a defined module."""
+    for mod_id, module in modules_config.get('modules', {}).items():
+        for dep in module.get('depends_on', []):
+            if dep not in module_names:
+                yield f"Module '{mod_id}' depends on undefined module: {dep}"
+
+
+def validate_import_patterns(modules_config: Dict[str, Any], module_names: frozenset) -> Iterator[str]:
+    """Every import_patterns value must point at defined modules."""
+    for pattern, target in modules_config.get('import_patterns', {}).items():
+        targets = target if isinstance(target, list) else [target]
+        for mod_id in targets:
+            if mod_id not in module_names:
+                yield f"Import pattern '{pattern}' maps to undefined module: {mod_id}"
+
+
+def _barrel_candidates(exports: Dict[str, Any]) -> List[Tuple[str, str, Tuple[str, str]]]:
+    """
+    (subpath, clean subpath, candidate source files) for every export
+    that maps to a single source; root and wildcard exports are skipped.
+    """
+    checked = []
+    for subpath in exports:
+        if subpath == '.' or '*' in subpath:
+            continue
+        clean_subpath = subpath[2:] if subpath.startswith('./') else subpath
+        checked.append((subpath, clean_subpath,
+                        (f"src/{clean_subpath}/index.ts", f"src/{clean_subpath}.ts")))
+    return checked
+
+
+@functools.lru_cache(maxsize=1)
+def _load_package_json(path_str: str) -> Dict[str, Any]:
+    """
+    Parse the shared package.json, caching the result so repeated
+    invocations within one process skip the re-read.
+    """
+    with open(path_str, 'rb') as f:
+        if _json_fast is not None:
+            return _json_fast.loads(f.read())
+        return json.load(f)
+
+
+def validate_barrel_exports(modules_config: Dict[str, Any], shared_dir: Path,
+                            defined_paths: frozenset,
+                            package_json: Dict[str, Any] | None = None) -> Iterator[str]:
+    """
+    Check that package.json subpath exports map to source files that are
+    covered by some module, so pruned zips can't lose an exported entry.
+
+    A caller that has already parsed the shared package.json can pass it
+    in; otherwise it is loaded (and cached) here.
+    """
+    if package_json is None:
+        package_json_path = os.path.join(os.fspath(shared_dir), 'package.json')
+        try:
+            # orjson.JSONDecodeError subclasses ValueError
+            package_json = _load_package_json(package_json_path)
+        except (OSError, ValueError):
+            yield f"Cannot read {package_json_path}"
+            return
+
+    exports = package_json.get('exports', {})
+
+    # Collect the candidate source files for every export first, so their
+    # existence can be probed in one overlapped batch
+    checked = _barrel_candidates(exports)
+
+    base = os.fspath(shared_dir)
+    all_candidates = [c for _, _, candidates in checked for c in candidates]
+    exists = dict(zip(
+        all_candidates,
+        _batch_exists([os.path.join(base, c) for c in all_candidates]),
+    ))
+
+    for subpath, clean_subpath, candidates in checked:
+        barrel_path = next((c for c in candidates if exists.get(c)), None)
+        if barrel_path is None:
+            yield f"Barrel export '{subpath}' has no source at src/{clean_subpath}"
+            continue
+
+        is_covered = any(
+            p == barrel_path or barrel_path.startswith(f"{p}/")
+            for p in defined_paths
+        )
+        if not is_covered:
+            yield f"Barrel export '{subpath}' ({barrel_path}) is not covered by any module"
+
+
+def find_uncovered_directories(fs_state: FSState, defined_paths: frozenset) -> Iterator[str]:
+    """
+    Warn about directories under shared/src that no module covers; they
+    would silently disappear from every pruned zip.
+    """
+    # Bucket the defined paths by top-level component once: top-level
+    # coverage becomes a dict-key test, and the integration check scans
+    # only the integrations bucket instead of every defined path.
+    coverage_index: Dict[str, Set[str]] = {}
+    for p in defined_paths:
+        parts = p.split('/', 2)
+        if parts[0] == 'src' and len(parts) >= 2:
+            coverage_index.setdefault(parts[1], set()).add(p)
+
+    for name in sorted(fs_state.top_level):
+        if name == 'integrations':
+            # Integrations are pruned per-plugin, so check one level deeper
+            integration_paths = coverage_index.get('integrations', ())
+            for sub_name in sorted(fs_state.integrations_children):
+                sub_path = f"src/integrations/{sub_name}"
+                is_sub_covered = any(
+                    p == sub_path or p.startswith(f"{sub_path}/")
+                    for p in integration_paths
+                )
+                if not is_sub_covered:
+                    yield f"Integration '{sub_name}' is not covered by any module"
+        elif name not in coverage_index:
+            yield f"Directory 'src/{name}' is not covered by any module"
+
+
+def _state_digest(fs_state: FSState, modules_config: Dict[str, Any]) -> str:
+    """
+    Digest of everything the validators read: config and package.json
+    stats, the shared/src directory listing, and the stats of every path
+    the validators probe individually.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in (SCRIPT_DIR / 'shared_modules.json', SHARED_DIR / 'package.json'):
+        try:
+            st = os.stat(path)
+            digest.update(f"{path.name}|{st.st_mtime_ns}|{st.st_size}".encode())
+        except OSError:
+            digest.update(f"{path.name}|missing".encode())
+    digest.update('\n'.join(sorted(fs_state.all_paths)).encode())
+
+    # The listing walk is pruned below integration roots, but module
+    # paths and barrel sources can point deeper; fold their stats in so
+    # deleting or editing such a file invalidates the cache
+    base = os.fspath(SHARED_DIR)
+    probes: Set[str] = set(get_defined_paths(modules_config))
+    try:
+        exports = _load_package_json(os.path.join(base, 'package.json')).get('exports', {})
+    except (OSError, ValueError):
+        exports = {}
+    for _, _, candidates in _barrel_candidates(exports):
+        probes.update(candidates)
+    for path in sorted(probes):
+        try:
+            st = os.stat(os.path.join(base, path))
+            digest.update(f"|{path}|{st.st_mtime_ns}|{st.st_size}".encode())
+        except OSError:
+            digest.update(f"|{path}|missing".encode())
+
+    return digest.hexdigest()
+
+
+def main():
+    force = '--force' in sys.argv[1:]
+
+    if not SHARED_DIR.is_dir():
+        print(f"shared directory not found: {SHARED_DIR}", file=sys.stderr)
+        sys.exit(1)
+
+    shared_src_dir = SHARED_DIR / 'src'
+    modules_config = load_modules_config()
+    fs_state = collect_fs_state(shared_src_dir)
+
+    # Unchanged inputs can't produce a different verdict: if the digest
+    # matches the last green run, skip the validations outright
+    digest = _state_digest(fs_state, modules_config)
+    if not force:
+        try:
+            if _CACHE_FILE.read_text().strip() == digest:
+                print("✅ shared_modules.json unchanged since last green run")
+                return
+        except OSError:
+            pass
+
+    # The config never changes mid-run: derive these once and share them
+    # across the validators instead of rebuilding per check
+    defined_paths = frozenset(get_defined_paths(modules_config))
+    module_names = frozenset(modules_config.get('modules', {}))
+
+    all_errors = list(itertools.chain(
+        validate_paths_exist(modules_config, SHARED_DIR),
+        validate_dependencies_exist(modules_config, module_names),
+        validate_import_patterns(modules_config, module_names),
+        validate_barrel_exports(modules_config, SHARED_DIR, defined_paths),
+    ))
+    warnings = list(find_uncovered_directories(fs_state, defined_paths))
+
+    # Assemble the whole report and write it once: on line-buffered CI
+    # stdout a print per message is a write syscall per message
+    lines = []
+    if all_errors:
+        lines.append(f"\n❌ {len(all_errors)} error(s) in shared_modules.json:\n")
+        lines.extend(f"  ❌ {error}" for error in all_errors)
+
+    if warnings:
+        lines.append(f"\n⚠️  {len(warnings)} warning(s):\n")
+        lines.extend(f"  ⚠️  {warning}" for warning in warnings)
+
+    if not all_errors:
+        lines.append("✅ shared_modules.json is consistent")
+
+    sys.stdout.write('\n'.join(lines) + '\n')
+
+    if all_errors:
+        sys.exit(1)
+
+    # Record the green run; best-effort and atomic so a concurrent reader
+    # never sees a partial digest
+    try:
+        _CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _CACHE_FILE.with_suffix('.bin.tmp')
+        tmp_path.write_text(digest + '\n')
+        os.replace(tmp_path, _CACHE_FILE)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    main()